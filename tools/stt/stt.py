@@ -1,42 +1,98 @@
 #!/usr/bin/env python3
 """
 Speech-to-Text (STT) tool for Claude Code hooks
-- Primary: OpenAI Whisper local inference (tiny model for 2GB RAM)
+- Primary: faster-whisper local inference (tiny model, int8 on CPU for 2GB RAM)
 - Fallback: AssemblyAI free online API
 
 Usage:
   python stt.py --record 5    # Record 5 seconds and transcribe
+  python stt.py --record 5 out.wav  # Same, and keep the recording as WAV
   python stt.py audio.wav     # Transcribe existing audio file
   python stt.py --live        # Live transcription (press space to record)
+  python stt.py --record 5 --chunk 1024  # Smaller audio buffers
+
+The Whisper model is kept loaded by stt_server.py, which is started on first
+use and answers later invocations over a Unix socket.
 
 Requirements:
-  pip install openai-whisper pyaudio assemblyai
+  pip install "faster-whisper>=1.1,<1.2" pyaudio assemblyai
 """
 
 import sys
 import os
 import time
+import json
 import wave
-import threading
+import base64
+import socket
+import atexit
+import bisect
+import gc
+import ctypes
+import asyncio
+import termios
+import tty
+import stat
 import tempfile
 import platform
 import subprocess
 from pathlib import Path
+from collections import deque
 
 try:
+    import numpy as np
     import pyaudio
-    import whisper
     import assemblyai as aai
 except ImportError as e:
     print(f"Missing dependency: {e}")
-    print("Install with: pip install openai-whisper pyaudio assemblyai")
+    print('Install with: pip install "faster-whisper>=1.1,<1.2" pyaudio assemblyai')
     sys.exit(1)
 
+try:
+    import faster_whisper
+    from faster_whisper import WhisperModel
+except ImportError:
+    # Fall back to openai-whisper where CTranslate2 can't be installed
+    WhisperModel = None
+    try:
+        import torch
+        import whisper
+    except ImportError as e:
+        print(f"Missing dependency: {e}")
+        print('Install with: pip install "faster-whisper>=1.1,<1.2" (or openai-whisper)')
+        sys.exit(1)
+
+# Live-mode batching relies on faster-whisper 1.1.x: clip_timestamps are sample
+# offsets and each clip is its own chunk. 1.0 has no batched pipeline and 1.2
+# merges clips, so other versions transcribe recordings one at a time.
+BatchedInferencePipeline = None
+if WhisperModel is not None and faster_whisper.__version__.split(".")[:2] == ["1", "1"]:
+    from faster_whisper import BatchedInferencePipeline
+
+# Resident Whisper model (see stt_server.py), one server per user
+SERVER_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"stt-{os.getuid()}.sock"
+)
+SERVER_SCRIPT = Path(__file__).with_name("stt_server.py")
+SERVER_KEEPALIVE_INTERVAL = 5  # seconds between keepalives while transcribing
+SERVER_SILENCE_TIMEOUT = 30  # no keepalive for this long means the server hung
+
 class SpeechToText:
     def __init__(self):
         self.whisper_model = None
+        self.batched_pipeline = None
+        # Use the stt_server.py model; live mode keeps its own model instead
+        self.use_server = True
+        # Silero VAD drops silence before the encoder runs; cut at 500 ms pauses
+        self.vad_parameters = dict(min_silence_duration_ms=500)
         self.recording = False
-        self.frames = []
+        self.buf = bytearray()
+        self.pos = 0
+        
+        # PortAudio context and input stream, opened on first recording and reused
+        self._pa = None
+        self._stream = None
+        self._stream_chunk = None
         
         # AssemblyAI API key (free tier: 5 hours/month)
         # You can get a free API key at https://www.assemblyai.com/
@@ -44,35 +100,223 @@ class SpeechToText:
         
         # Audio settings
         self.sample_rate = 16000
-        self.chunk_size = 1024
+        # Larger buffers mean fewer PortAudio -> Python callbacks (~4/s at 4096)
+        self.chunk_size = 4096
+        # Live mode stops on a key press, keep its buffers shorter
+        self.live_chunk_size = 2048
         self.channels = 1
         self.format = pyaudio.paInt16
+        # Bytes per sample, avoids creating a PortAudio instance just to ask
+        self._sample_width = {
+            pyaudio.paInt16: 2,
+            pyaudio.paInt24: 3,
+            pyaudio.paInt32: 4,
+            pyaudio.paFloat32: 4
+        }[self.format]
         
     def load_whisper_model(self, model_size="tiny"):
         """Load Whisper model for local inference"""
         try:
             print(f"Loading Whisper {model_size} model...")
-            self.whisper_model = whisper.load_model(model_size)
+            if WhisperModel is not None:
+                # int8 weights + CTranslate2 C++ decoder, much faster than FP32 PyTorch on CPU
+                self.whisper_model = WhisperModel(
+                    model_size,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=os.cpu_count()
+                )
+            elif os.getenv("STT_QUANTIZE", "1") == "1":
+                # openai-whisper: int8 dynamic quantization of the Linear layers,
+                # calibration-free and CPU only (disable with STT_QUANTIZE=0)
+                model = whisper.load_model(model_size, device="cpu")
+                try:
+                    # quantize_dynamic matches exact types, whisper's Linear subclass is skipped
+                    self._plain_linear(model)
+                    quantized = torch.ao.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                    if not any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear)
+                               for m in quantized.modules()):
+                        raise RuntimeError("no Linear layer was quantized")
+                    model = quantized
+                except Exception as e:
+                    # e.g. no quantized engine in this torch build
+                    print(f"Warning: int8 quantization failed ({e}), using FP32 model")
+                self.whisper_model = model
+            else:
+                # CPU like the quantized path, transcription runs with fp16=False
+                self.whisper_model = whisper.load_model(model_size, device="cpu")
             print(f"Whisper {model_size} model loaded successfully")
             return True
         except Exception as e:
             print(f"Error loading Whisper model: {e}")
             return False
     
-    def transcribe_with_whisper(self, audio_file):
-        """Transcribe using local Whisper model"""
+    def _plain_linear(self, module):
+        """Replace Linear subclasses (whisper.model.Linear) with torch.nn.Linear in place"""
+        for name, child in module.named_children():
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                linear = torch.nn.Linear(
+                    child.in_features, child.out_features, bias=child.bias is not None
+                )
+                # Share the loaded parameters instead of copying them
+                linear.weight = child.weight
+                linear.bias = child.bias
+                setattr(module, name, linear)
+            else:
+                self._plain_linear(child)
+    
+    def release_whisper_model(self):
+        """Free the in-process Whisper model and return the memory to the OS
+        
+        Only matters when the model was loaded here (server unavailable);
+        otherwise it lives in stt_server.py until that goes idle.
+        """
+        self.whisper_model = None
+        self.batched_pipeline = None
+        gc.collect()
+        
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        
+        # glibc keeps freed heap pages, hand them back
+        if platform.system() == "Linux":
+            try:
+                ctypes.CDLL("libc.so.6").malloc_trim(0)
+            except (OSError, AttributeError):
+                pass
+    
+    def transcribe_with_whisper(self, audio):
+        """Transcribe using local Whisper model (file path or float32 array)"""
+        # Prefer the already loaded model in the server unless we have our own
+        if self.use_server and not self.whisper_model:
+            text = self.transcribe_with_server(audio)
+            if text is not None:
+                return text
+        
+        return self.transcribe_in_process(audio)
+    
+    def transcribe_in_process(self, audio):
+        """Transcribe with a Whisper model loaded in this process"""
         if not self.whisper_model:
             if not self.load_whisper_model("tiny"):
                 return None
         
         try:
             print("Transcribing with Whisper (local)...")
-            result = self.whisper_model.transcribe(audio_file)
-            return result["text"].strip()
+            if WhisperModel is None:
+                result = self.whisper_model.transcribe(audio, fp16=False)
+                return result["text"].strip()
+            
+            segments, _ = self.whisper_model.transcribe(
+                audio,
+                beam_size=1,
+                vad_filter=True,
+                vad_parameters=self.vad_parameters
+            )
+            # segments is a lazy generator, decoding happens while joining
+            return "".join(seg.text for seg in segments).strip()
         except Exception as e:
             print(f"Whisper transcription error: {e}")
             return None
     
+    def transcribe_with_server(self, audio):
+        """Transcribe using the stt_server.py daemon, starting it if needed"""
+        if isinstance(audio, str):
+            # The server has its own working directory
+            request = {"audio": os.path.abspath(audio)}
+        else:
+            request = {
+                "audio": base64.b64encode(audio.astype(np.float32).tobytes()).decode("ascii"),
+                "encoding": "float32"
+            }
+        
+        sock = self.connect_server()
+        if sock is None:
+            return None
+        
+        try:
+            with sock:
+                # The server sends keepalives, so long files don't hit this
+                sock.settimeout(SERVER_SILENCE_TIMEOUT)
+                print("Transcribing with Whisper (server)...")
+                sock.sendall(json.dumps(request).encode() + b"\n")
+                sock.shutdown(socket.SHUT_WR)
+                response = json.loads(b"".join(iter(lambda: sock.recv(65536), b"")))
+        except (OSError, ValueError) as e:
+            print(f"Whisper server error: {e}")
+            return None
+        
+        if "error" in response:
+            print(f"Whisper server error: {response['error']}")
+            return None
+        return response["text"].strip()
+    
+    def connect_server(self):
+        """Connect to the Whisper server, launching it on first use"""
+        def connect():
+            # Only talk to a socket we own, never one planted by another user
+            st = os.lstat(SERVER_SOCKET)
+            if st.st_uid != os.getuid() or not stat.S_ISSOCK(st.st_mode):
+                raise PermissionError(f"{SERVER_SOCKET} is not a socket owned by this user")
+            
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(SERVER_SOCKET)
+                return sock
+            except OSError:
+                sock.close()
+                raise
+        
+        try:
+            return connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+        except OSError as e:
+            print(f"Whisper server unavailable: {e}")
+            return None
+        
+        # Not running yet: start it detached so it outlives this process
+        print("Starting Whisper server...")
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, str(SERVER_SCRIPT)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            print(f"Could not start Whisper server: {e}")
+            return None
+        
+        # The socket only appears once the model is loaded (or downloaded on
+        # first run). Wait as long as the server is alive: loading a second
+        # copy in-process would need twice the RAM.
+        print("Waiting for Whisper server to load the model...")
+        while True:
+            time.sleep(0.2)
+            try:
+                return connect()
+            except (FileNotFoundError, ConnectionRefusedError):
+                pass
+            except OSError as e:
+                print(f"Whisper server unavailable: {e}")
+                return None
+            
+            # Server exited (failed model load, missing deps, already running
+            # under a race); one last try in case another server is now up
+            if proc.poll() is not None:
+                try:
+                    return connect()
+                except OSError:
+                    break
+        
+        print("Whisper server failed to start, loading model in-process")
+        return None
+    
     def transcribe_with_assemblyai(self, audio_file):
         """Transcribe using AssemblyAI online API"""
         try:
@@ -101,63 +345,128 @@ class SpeechToText:
             return None
     
     def record_audio(self, duration=5, output_file=None):
-        """Record audio for specified duration"""
-        if output_file is None:
-            output_file = tempfile.mktemp(suffix='.wav')
+        """Record audio for specified duration, returns float32 samples
         
+        A WAV copy is only written when output_file is given.
+        """
         try:
-            audio = pyaudio.PyAudio()
+            stream = self.open_stream(self.chunk_size)
             
-            # Open stream
-            stream = audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
+            # Pre-size the buffer for the whole recording (16-bit samples)
+            self.buf = bytearray(self.sample_rate * self._sample_width * self.channels * duration)
+            self.pos = 0
             
+            # PortAudio pushes chunks into the buffer via callback
             print(f"Recording for {duration} seconds...")
-            self.frames = []
-            
-            for i in range(0, int(self.sample_rate / self.chunk_size * duration)):
-                data = stream.read(self.chunk_size)
-                self.frames.append(data)
+            stream.start_stream()
+            while stream.is_active():
+                time.sleep(0.1)
             
             print("Recording finished")
             
-            # Stop recording
+            # Stop recording, the stream stays open for the next one
             stream.stop_stream()
-            stream.close()
-            audio.terminate()
             
-            # Save audio file
-            with wave.open(output_file, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(audio.get_sample_size(self.format))
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(b''.join(self.frames))
+            audio = self.get_audio_array()
+            if output_file:
+                self.save_wav(output_file, audio)
             
-            return output_file
+            return audio
             
         except Exception as e:
             print(f"Recording error: {e}")
             return None
     
-    def transcribe_file(self, audio_file):
-        """Transcribe audio file with fallback options"""
-        if not os.path.exists(audio_file):
-            print(f"Audio file not found: {audio_file}")
+    def open_stream(self, frames_per_buffer):
+        """Open the input stream (stopped) once and reuse it across recordings"""
+        if self._stream is not None and self._stream_chunk == frames_per_buffer:
+            return self._stream
+        
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+            atexit.register(self._cleanup)
+        
+        self._stream = self._pa.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=self._record_callback,
+            start=False
+        )
+        self._stream_chunk = frames_per_buffer
+        return self._stream
+    
+    def _cleanup(self):
+        """Close the stream and PortAudio at exit"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+    
+    def get_audio_array(self):
+        """Recorded 16-bit PCM as float32 mono in [-1, 1], what Whisper expects"""
+        # Zero-copy int16 view of the buffer (PortAudio delivers native byte order),
+        # then one vectorized pass int16 -> scaled float32 with a single allocation
+        pcm = np.frombuffer(self.buf, dtype=np.int16, count=self.pos // self._sample_width)
+        return np.multiply(pcm, 1 / 32768.0, dtype=np.float32)
+    
+    def save_wav(self, output_file, audio):
+        """Write float32 samples in [-1, 1] to a 16-bit WAV file"""
+        pcm = np.clip(audio * 32768.0, -32768, 32767).astype(np.int16)
+        with wave.open(output_file, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm.tobytes())
+        return output_file
+    
+    def _record_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: copy the chunk into the pre-allocated buffer"""
+        end = self.pos + len(in_data)
+        if end > len(self.buf):
+            if not self.recording:
+                # Fixed-duration recording is full
+                in_data = in_data[:len(self.buf) - self.pos]
+                end = len(self.buf)
+            else:
+                # Open-ended recording, grow the buffer geometrically
+                self.buf.extend(bytes(max(len(self.buf), len(in_data))))
+        self.buf[self.pos:end] = in_data
+        self.pos = end
+        
+        if not self.recording and self.pos >= len(self.buf):
+            return (None, pyaudio.paComplete)
+        return (None, pyaudio.paContinue)
+    
+    def transcribe_file(self, audio):
+        """Transcribe audio file or recorded samples with fallback options"""
+        if isinstance(audio, str) and not os.path.exists(audio):
+            print(f"Audio file not found: {audio}")
             return None
         
         # Try Whisper first (local)
-        text = self.transcribe_with_whisper(audio_file)
+        text = self.transcribe_with_whisper(audio)
         if text:
             print("✅ Transcribed with Whisper (local)")
             return text
         
-        # Fallback to AssemblyAI (online)
-        text = self.transcribe_with_assemblyai(audio_file)
+        # Fallback to AssemblyAI (online), which needs a file to upload
+        if isinstance(audio, str):
+            text = self.transcribe_with_assemblyai(audio)
+        else:
+            temp_file = self.save_wav(tempfile.mktemp(suffix='.wav'), audio)
+            text = self.transcribe_with_assemblyai(temp_file)
+            try:
+                os.remove(temp_file)
+            except:
+                pass
         if text:
             print("✅ Transcribed with AssemblyAI (online)")
             return text
@@ -165,107 +474,181 @@ class SpeechToText:
         print("❌ All transcription methods failed")
         return None
     
-    def live_transcription(self):
+    def transcribe_batch(self, utterances):
+        """Transcribe several (id, audio) recordings with one batched Whisper pass
+        
+        Each recording (split into 30 s pieces if longer) is passed as its own
+        clip, so it becomes its own item in the encoder batch; segments are
+        mapped back to recordings by the clip they start in.
+        """
+        if (BatchedInferencePipeline is not None and len(utterances) > 1
+                and (self.whisper_model or self.load_whisper_model("tiny"))):
+            try:
+                if self.batched_pipeline is None:
+                    self.batched_pipeline = BatchedInferencePipeline(model=self.whisper_model)
+                
+                max_clip = 30 * self.sample_rate
+                clips, clip_starts, clip_owner, offset = [], [], [], 0
+                for index, (_, audio) in enumerate(utterances):
+                    for start in range(0, len(audio), max_clip):
+                        end = min(start + max_clip, len(audio))
+                        clips.append({"start": offset + start, "end": offset + end})
+                        clip_starts.append((offset + start) / self.sample_rate)
+                        clip_owner.append(index)
+                    offset += len(audio)
+                
+                print(f"Transcribing {len(utterances)} recordings with Whisper (batched)...")
+                segments, _ = self.batched_pipeline.transcribe(
+                    np.concatenate([audio for _, audio in utterances]),
+                    clip_timestamps=clips,
+                    batch_size=len(clips),
+                    beam_size=1,
+                    vad_filter=False
+                )
+                
+                texts = [[] for _ in utterances]
+                for seg in segments:
+                    # Segment times are rounded, allow a little slack at clip starts
+                    clip = bisect.bisect_right(clip_starts, seg.start + 0.01) - 1
+                    texts[clip_owner[max(clip, 0)]].append(seg.text)
+                
+                return [(uid, "".join(text).strip()) for (uid, _), text in zip(utterances, texts)]
+            
+            except Exception as e:
+                print(f"Batched transcription error: {e}")
+        
+        # Single recording or batching unavailable: one at a time with fallbacks
+        return [(uid, self.transcribe_file(audio)) for uid, audio in utterances]
+    
+    async def batch_worker(self, batch_size, batch_timeout):
+        """Drain queued live recordings, flushing when full or idle"""
+        while True:
+            while not self.pending and not self.live_done:
+                self.pending_added.clear()
+                await self.pending_added.wait()
+            if not self.pending:
+                return
+            
+            # Each new recording restarts the idle timer
+            while len(self.pending) < batch_size and not self.live_done:
+                self.pending_added.clear()
+                try:
+                    await asyncio.wait_for(self.pending_added.wait(), batch_timeout)
+                except asyncio.TimeoutError:
+                    break
+            
+            batch = [self.pending.popleft() for _ in range(min(batch_size, len(self.pending)))]
+            
+            # Transcribe (possibly an AssemblyAI round-trip) in a worker thread so
+            # recording continues; batches run one after another on the model
+            task = asyncio.create_task(asyncio.to_thread(self.transcribe_batch, batch))
+            task.add_done_callback(self.print_transcriptions)
+            await asyncio.wait([task])
+    
+    def print_transcriptions(self, task):
+        """Completion callback for a transcribed batch"""
+        if task.cancelled():
+            return
+        if task.exception():
+            print(f"Transcription error: {task.exception()}")
+            return
+        for uid, text in task.result():
+            if text:
+                print(f"\\n📝 Transcription #{uid}: {text}")
+    
+    def live_transcription(self, batch_size=4, batch_timeout=0.5):
         """Live transcription with space bar to record"""
         print("Live transcription mode:")
         print("- Press SPACE to start/stop recording")
         print("- Press 'q' to quit")
         print("- Each recording will be transcribed automatically")
         
-        try:
-            import keyboard
-        except ImportError:
-            print("keyboard library not installed. Install with: pip install keyboard")
+        if not sys.stdin.isatty():
+            print("Live mode needs an interactive terminal")
             return
         
+        # Batches need the model in this process; don't also load it in the server
+        self.use_server = False
+        asyncio.run(self.live_loop(batch_size, batch_timeout))
+    
+    async def live_loop(self, batch_size, batch_timeout):
+        """Read key presses and queue recordings, transcription runs alongside"""
+        self.pending = deque()
+        self.pending_added = asyncio.Event()
+        self.live_done = False
+        worker = asyncio.create_task(self.batch_worker(batch_size, batch_timeout))
         recording_count = 0
         
-        while True:
-            print("\\nPress SPACE to record, 'q' to quit...")
-            
-            # Wait for space or q
-            event = keyboard.read_event()
-            if event.event_type == keyboard.KEY_DOWN:
-                if event.name == 'space':
-                    recording_count += 1
-                    temp_file = f"/tmp/recording_{recording_count}.wav"
-                    
+        # Read single key presses from the terminal: cbreak mode (no line
+        # buffering or echo) and the event loop's selector wakes us per byte
+        loop = asyncio.get_running_loop()
+        keys = asyncio.Queue()
+        fd = sys.stdin.fileno()
+        old_attrs = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        loop.add_reader(fd, lambda: keys.put_nowait(os.read(fd, 1)))
+        
+        try:
+            while True:
+                print("\\nPress SPACE to record, 'q' to quit...")
+                
+                # Wait for space or q
+                key = await keys.get()
+                if key == b' ':
                     print("Recording... Press SPACE again to stop")
                     self.start_recording()
                     
                     # Wait for space again to stop
-                    while True:
-                        event = keyboard.read_event()
-                        if event.event_type == keyboard.KEY_DOWN and event.name == 'space':
-                            break
+                    while await keys.get() != b' ':
+                        pass
                     
-                    audio_file = self.stop_recording(temp_file)
-                    if audio_file:
-                        text = self.transcribe_file(audio_file)
-                        if text:
-                            print(f"\\n📝 Transcription: {text}")
-                        
-                        # Clean up temp file
-                        try:
-                            os.remove(audio_file)
-                        except:
-                            pass
+                    audio = self.stop_recording()
+                    if audio is not None:
+                        recording_count += 1
+                        self.pending.append((recording_count, audio))
+                        self.pending_added.set()
                 
-                elif event.name == 'q':
+                elif key in (b'q', b''):
                     print("Exiting live transcription...")
                     break
+        finally:
+            loop.remove_reader(fd)
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+        
+        # Let queued recordings finish transcribing
+        self.live_done = True
+        self.pending_added.set()
+        await worker
     
     def start_recording(self):
-        """Start recording in background thread"""
+        """Start recording, PortAudio fills the buffer from its own thread"""
+        # Start with 30 seconds of room, the callback grows it if needed
+        self.buf = bytearray(self.sample_rate * self._sample_width * self.channels * 30)
+        self.pos = 0
         self.recording = True
-        self.frames = []
-        
-        def record_thread():
-            try:
-                audio = pyaudio.PyAudio()
-                stream = audio.open(
-                    format=self.format,
-                    channels=self.channels,
-                    rate=self.sample_rate,
-                    input=True,
-                    frames_per_buffer=self.chunk_size
-                )
-                
-                while self.recording:
-                    data = stream.read(self.chunk_size)
-                    self.frames.append(data)
-                
-                stream.stop_stream()
-                stream.close()
-                audio.terminate()
-                
-            except Exception as e:
-                print(f"Recording thread error: {e}")
         
-        self.record_thread = threading.Thread(target=record_thread)
-        self.record_thread.start()
+        try:
+            self.open_stream(self.live_chunk_size).start_stream()
+        except Exception as e:
+            self.recording = False
+            print(f"Recording error: {e}")
     
-    def stop_recording(self, output_file):
-        """Stop recording and save file"""
+    def stop_recording(self, output_file=None):
+        """Stop recording, returns float32 samples (WAV only if output_file given)"""
+        if self._stream is not None and not self._stream.is_stopped():
+            self._stream.stop_stream()
         self.recording = False
-        if hasattr(self, 'record_thread'):
-            self.record_thread.join()
         
-        if not self.frames:
+        if not self.pos:
             print("No audio recorded")
             return None
         
         try:
-            # Save audio file
-            audio = pyaudio.PyAudio()
-            with wave.open(output_file, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(audio.get_sample_size(self.format))
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(b''.join(self.frames))
-            audio.terminate()
+            audio = self.get_audio_array()
+            if output_file:
+                self.save_wav(output_file, audio)
             
-            return output_file
+            return audio
             
         except Exception as e:
             print(f"Error saving recording: {e}")
@@ -274,12 +657,24 @@ class SpeechToText:
 def main():
     stt = SpeechToText()
     
+    # Optional --chunk N (frames per buffer) for recording
+    if "--chunk" in sys.argv:
+        i = sys.argv.index("--chunk")
+        try:
+            stt.chunk_size = int(sys.argv[i + 1])
+        except (IndexError, ValueError):
+            print("Chunk size must be a number")
+            sys.exit(1)
+        del sys.argv[i:i + 2]
+    
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python stt.py --record 5        # Record 5 seconds")
+        print("  python stt.py --record 5 out.wav  # Record and keep a WAV copy")
         print("  python stt.py audio.wav         # Transcribe file")
         print("  python stt.py --live            # Live transcription")
         print("  python stt.py --models          # List available models")
+        print("  --chunk 4096                    # Frames per audio buffer (default 4096)")
         print()
         print("Setup:")
         print("  export ASSEMBLYAI_API_KEY=your_key_here")
@@ -297,19 +692,15 @@ def main():
     
     elif sys.argv[1] == "--record":
         duration = int(sys.argv[2]) if len(sys.argv) > 2 else 5
-        temp_file = tempfile.mktemp(suffix='.wav')
+        # Optional WAV path to keep a copy of the recording
+        output_file = sys.argv[3] if len(sys.argv) > 3 else None
         
-        audio_file = stt.record_audio(duration, temp_file)
-        if audio_file:
-            text = stt.transcribe_file(audio_file)
+        audio = stt.record_audio(duration, output_file)
+        if audio is not None:
+            text = stt.transcribe_file(audio)
+            stt.release_whisper_model()
             if text:
                 print(f"\\n📝 Transcription: {text}")
-            
-            # Clean up
-            try:
-                os.remove(audio_file)
-            except:
-                pass
     
     elif sys.argv[1] == "--live":
         stt.live_transcription()
@@ -318,6 +709,7 @@ def main():
         # Transcribe existing file
         audio_file = sys.argv[1]
         text = stt.transcribe_file(audio_file)
+        stt.release_whisper_model()
         if text:
             print(f"\\n📝 Transcription: {text}")
 
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Whisper server for the STT tool
+- Loads the Whisper model once and keeps it in memory
+- Answers transcription requests from stt.py over a Unix socket
+- Shuts down after 2 minutes without requests (STT_SERVER_IDLE to change)
+
+Usage:
+  python stt_server.py        # Normally started automatically by stt.py
+
+Protocol (one JSON request per connection):
+  {"audio": "/path/to/audio.wav"}
+  {"audio": "<base64 float32 samples>", "encoding": "float32"}
+  -> {"text": "..."} or {"error": "..."}
+  While transcribing, a space is sent every few seconds as a keepalive
+  (JSON ignores leading whitespace), so clients can tell a busy server
+  from a hung one.
+"""
+
+import sys
+import os
+import json
+import base64
+import socket
+import threading
+
+from stt import SpeechToText, SERVER_SOCKET, SERVER_KEEPALIVE_INTERVAL, np
+
+# Short by default so the model's RAM is returned soon after a burst of use
+IDLE_TIMEOUT = int(os.getenv("STT_SERVER_IDLE", "120"))  # seconds
+
+def server_running():
+    """Check if another server is already listening on the socket"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SERVER_SOCKET)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def handle_request(stt, request):
+    """Transcribe one decoded request"""
+    audio = request["audio"]
+    if request.get("encoding") == "float32":
+        audio = np.frombuffer(base64.b64decode(audio), dtype=np.float32)
+
+    text = stt.transcribe_in_process(audio)
+    if text is None:
+        return {"error": "transcription failed"}
+    return {"text": text}
+
+def main():
+    if server_running():
+        print("Whisper server already running")
+        sys.exit(0)
+
+    stt = SpeechToText()
+    if not stt.load_whisper_model("tiny"):
+        sys.exit(1)
+
+    # Another client may have started a server while we were loading
+    if server_running():
+        print("Whisper server already running")
+        sys.exit(0)
+
+    # Remove stale socket left by a crashed server (only if it is ours)
+    if os.path.lexists(SERVER_SOCKET):
+        if os.lstat(SERVER_SOCKET).st_uid != os.getuid():
+            print(f"{SERVER_SOCKET} belongs to another user")
+            sys.exit(1)
+        os.remove(SERVER_SOCKET)
+
+    # Create the socket owner-only from the start, no window before chmod
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(SERVER_SOCKET)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    server.settimeout(IDLE_TIMEOUT)
+    print(f"Whisper server listening on {SERVER_SOCKET}")
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                print("No requests, shutting down")
+                break
+
+            with conn:
+                conn.settimeout(None)
+                response = {}
+
+                def work(request):
+                    try:
+                        response.update(handle_request(stt, request))
+                    except Exception as e:
+                        response["error"] = str(e)
+
+                try:
+                    request = json.loads(b"".join(iter(lambda: conn.recv(65536), b"")))
+                except (OSError, ValueError) as e:
+                    request = None
+                    response["error"] = f"bad request: {e}"
+
+                worker = threading.Thread(target=work, args=(request,))
+                if request is not None:
+                    worker.start()
+
+                try:
+                    # Keepalives while the model works on long audio
+                    while worker.is_alive():
+                        worker.join(SERVER_KEEPALIVE_INTERVAL)
+                        if worker.is_alive():
+                            conn.sendall(b" ")
+                    conn.sendall(json.dumps(response).encode())
+                except OSError:
+                    # Client went away, still let the model finish before the next request
+                    if worker.is_alive():
+                        worker.join()
+    finally:
+        server.close()
+        try:
+            os.remove(SERVER_SOCKET)
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -19,37 +19,116 @@ import asyncio
 import subprocess
 import platform
 import os
-import socket
+import shutil
+import functools
+import threading
+import objc
+from Foundation import NSObject
+from CoreFoundation import CFRunLoopGetCurrent, CFRunLoopRunInMode, CFRunLoopStop, kCFRunLoopDefaultMode
 from AVFoundation import AVSpeechSynthesizer, AVSpeechUtterance, AVSpeechSynthesisVoice
 
+try:
+    import edge_tts
+except ImportError:
+    edge_tts = None  # Only the macOS fallback is available
+
+class SpeechDelegate(NSObject):
+    """AVSpeechSynthesizer delegate that signals when an utterance ends"""
+    
+    def init(self):
+        self = objc.super(SpeechDelegate, self).init()
+        if self is None:
+            return None
+        self.done = threading.Event()
+        self.run_loop = None
+        return self
+    
+    def finish(self):
+        self.done.set()
+        # Wake the waiting run loop right away instead of at its timeout
+        if self.run_loop is not None:
+            CFRunLoopStop(self.run_loop)
+    
+    def speechSynthesizer_didFinishSpeechUtterance_(self, synthesizer, utterance):
+        self.finish()
+    
+    def speechSynthesizer_didCancelSpeechUtterance_(self, synthesizer, utterance):
+        self.finish()
+
 class CombinedTTS:
+    # Last connectivity result shared by all instances: (ok, monotonic timestamp)
+    _net_ok = None
+    _net_ts = 0.0
+    NET_TTL = 60  # seconds
+    EDGE_TIMEOUT = 2  # seconds to wait for the first audio chunk
+    SPEAK_START_GRACE = 0.5  # seconds before a silent synthesizer counts as done
+    
     def __init__(self):
         self.synthesizer = AVSpeechSynthesizer.alloc().init()
-        self.finished = False
+        # Synthesizer only holds a weak reference, keep ours
+        self.delegate = SpeechDelegate.alloc().init()
+        self.synthesizer.setDelegate_(self.delegate)
         
-    def check_internet(self):
-        """Check if internet connection is available"""
-        try:
-            # Try to connect to Microsoft's server
-            socket.create_connection(("speech.platform.bing.com", 443), timeout=3)
-            return True
-        except OSError:
-            return False
+    def set_internet(self, ok):
+        """Record connectivity result in the shared cache"""
+        CombinedTTS._net_ok = ok
+        CombinedTTS._net_ts = time.monotonic()
+    
+    def known_offline(self):
+        """True if a recent Edge TTS attempt could not reach the service"""
+        return CombinedTTS._net_ok is False and time.monotonic() - CombinedTTS._net_ts < self.NET_TTL
     
     def speak_with_edge_tts(self, message):
         """Use Microsoft Edge TTS with Aria Neural voice"""
+        if edge_tts is None:
+            print("Edge TTS not available. Install with: pip install edge-tts")
+            return False
+        
         try:
-            import edge_tts
-            
             # Use Aria Neural voice (high quality US female)
             voice = "en-US-AriaNeural"
             
             async def generate_speech():
                 output_file = "/tmp/claude_tts_output.mp3"
                 
-                # Generate speech
+                # Generate speech, giving up quickly if the service is unreachable
                 communicate = edge_tts.Communicate(message, voice)
-                await communicate.save(output_file)
+                stream = communicate.stream()
+                try:
+                    first = await asyncio.wait_for(stream.__anext__(), timeout=self.EDGE_TIMEOUT)
+                except (asyncio.TimeoutError, OSError):
+                    # Only a failure to reach the service counts as offline
+                    self.set_internet(False)
+                    raise
+                
+                # Pipe audio into the player as it arrives, playback starts
+                # before synthesis of the whole message has finished
+                player = self.stream_player()
+                if player:
+                    proc = await asyncio.create_subprocess_exec(
+                        *player,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.DEVNULL
+                    )
+                    try:
+                        async for chunk in self.prepend(first, stream):
+                            if chunk["type"] == "audio":
+                                proc.stdin.write(chunk["data"])
+                                await proc.stdin.drain()
+                    finally:
+                        proc.stdin.close()
+                        await proc.wait()
+                    
+                    if proc.returncode:
+                        raise subprocess.CalledProcessError(proc.returncode, player)
+                    return
+                
+                # afplay can't read stdin, go through a temporary file
+                with open(output_file, "wb") as f:
+                    async for chunk in self.prepend(first, stream):
+                        if chunk["type"] == "audio":
+                            f.write(chunk["data"])
                 
                 # Play the audio file
                 if platform.system() == "Darwin":  # macOS
@@ -62,17 +141,35 @@ class CombinedTTS:
             
             # Run the async function
             asyncio.run(generate_speech())
+            self.set_internet(True)
             return True
             
-        except ImportError:
-            print("Edge TTS not available. Install with: pip install edge-tts")
+        except asyncio.TimeoutError:
+            print("Edge TTS unreachable: no audio received in time")
             return False
         except Exception as e:
             print(f"Edge TTS error: {e}")
             return False
     
+    @staticmethod
+    def stream_player():
+        """Command for an installed MP3 player that reads from stdin, or None"""
+        if shutil.which("mpg123"):
+            return ["mpg123", "-q", "-"]
+        if shutil.which("ffplay"):
+            return ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-"]
+        return None
+    
+    @staticmethod
+    async def prepend(first, stream):
+        """Yield an already received chunk followed by the rest of the stream"""
+        yield first
+        async for chunk in stream:
+            yield chunk
+    
+    @functools.lru_cache(maxsize=None)
     def get_voices(self):
-        """Get all available macOS voices"""
+        """Get all available macOS voices (enumerated once per instance)"""
         voices = AVSpeechSynthesisVoice.speechVoices()
         english_voices = []
         
@@ -87,6 +184,11 @@ class CombinedTTS:
         
         return english_voices
     
+    @functools.lru_cache(maxsize=None)
+    def get_voice_map(self):
+        """Map 1-based voice number to voice info for direct lookup"""
+        return dict(enumerate(self.get_voices(), 1))
+    
     def list_voices(self):
         """List all available English voices with numbers"""
         voices = self.get_voices()
@@ -103,15 +205,15 @@ class CombinedTTS:
     
     def speak_with_macos(self, message, voice_index=7):
         """Speak using macOS native voices"""
-        voices = self.get_voices()
+        voices = self.get_voice_map()
         
-        if 1 <= voice_index <= len(voices):
-            selected_voice = voices[voice_index - 1]
+        if voice_index in voices:
+            selected_voice = voices[voice_index]
             voice_id = selected_voice['identifier']
             print(f"Using macOS voice: {selected_voice['name']}")
         else:
             print(f"Invalid voice index. Using Daniel (voice 7)")
-            voice_id = voices[6]['identifier']  # Daniel is voice 7 (index 6)
+            voice_id = voices[7]['identifier']  # Daniel is voice 7
         
         # Create utterance
         utterance = AVSpeechUtterance.speechUtteranceWithString_(message)
@@ -124,19 +226,28 @@ class CombinedTTS:
         utterance.setVolume_(1.0)  # Full volume
         
         # Start speaking
+        self.delegate.done.clear()
+        self.delegate.run_loop = CFRunLoopGetCurrent()
         self.synthesizer.speakUtterance_(utterance)
+        started = time.monotonic()
         
-        # Wait for completion
-        while self.synthesizer.isSpeaking():
-            time.sleep(0.1)
+        # Wait for completion, running the run loop so the delegate callback
+        # is delivered. Each 1 s turn also checks isSpeaking() in case the
+        # callback never comes (empty message, utterance that never starts),
+        # after a short grace period for speech to begin.
+        while not self.delegate.done.is_set():
+            CFRunLoopRunInMode(kCFRunLoopDefaultMode, 1.0, True)
+            if (time.monotonic() - started > self.SPEAK_START_GRACE
+                    and not self.synthesizer.isSpeaking()):
+                break
         
         return True
     
     def speak(self, message, voice_index=None):
         """Main speak function - tries Edge TTS first, falls back to macOS"""
-        # Check internet connectivity
-        if self.check_internet():
-            print("Internet available - using Microsoft Aria Neural voice")
+        # No separate connectivity probe: Edge TTS itself times out quickly when offline
+        if not self.known_offline():
+            print("Trying Microsoft Aria Neural voice")
             if self.speak_with_edge_tts(message):
                 return True
             else: